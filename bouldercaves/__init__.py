@@ -15,3 +15,11 @@ if sys.version_info < (3, 6):
 
 user_data_dir = os.path.expanduser("~/.bouldercaves/")
 os.makedirs(user_data_dir, exist_ok=True)
+
+# regenerable data (such as decoded sounds) goes into the platform's cache directory instead
+if os.name == "nt":
+    user_cache_dir = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "bouldercaves", "cache") + os.sep
+elif sys.platform == "darwin":
+    user_cache_dir = os.path.expanduser("~/Library/Caches/bouldercaves/")
+else:
+    user_cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "bouldercaves") + "/"
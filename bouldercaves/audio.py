@@ -13,16 +13,19 @@ Written by Irmen de Jong (irmen@razorvine.net)
 License: GNU GPL 3.0, see LICENSE
 """
 
+import hashlib
 import pkgutil
 import time
 import tempfile
 import os
+import re
 import subprocess
+import wave
 from typing import Union, Dict, Tuple
 from synthplayer import streaming, params as synth_params
 from synthplayer.sample import Sample
 from synthplayer.playback import Output, best_api
-from . import user_data_dir
+from . import user_data_dir, user_cache_dir
 
 
 __all__ = ["init_audio", "play_sample", "silence_audio", "shutdown_audio"]
@@ -54,6 +57,61 @@ except IOError:
 
 
 samples = {}    # type: Dict[str, Union[str, Sample]]
+sound_cache_dir = user_cache_dir + "sounds/"
+
+
+def load_sound_file(name: str, filename: str) -> Sample:
+    data = pkgutil.get_data(__name__, "sounds/" + filename)
+    if not data:
+        raise SystemExit("corrupt package; sound data is missing")
+    # decoding an ogg file needs an external decoder process which is slow,
+    # so the decoded sample is cached as a wav file. The name contains a hash of the ogg data
+    # and of the decoding parameters, so a changed sound file or setting gets a new cache entry.
+    key = hashlib.md5(data)
+    key.update("{:d}-{:d}-{:d}".format(synth_params.norm_samplerate, synth_params.norm_samplewidth, synth_params.norm_nchannels).encode())
+    cachefile = sound_cache_dir + "{:s}-{:s}.wav".format(name, key.hexdigest())
+    if os.path.isfile(cachefile):
+        try:
+            return Sample(cachefile, name)
+        except (IOError, EOFError, wave.Error, AssertionError, ValueError):
+            pass    # corrupt or unusable cache file, decode it again
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".ogg")
+    try:
+        tmp.write(data)
+        tmp.close()
+        sample = Sample(streaming.AudiofileToWavStream(tmp.name), name).stereo()
+    finally:
+        os.remove(tmp.name)
+    try:
+        os.makedirs(sound_cache_dir, exist_ok=True)
+        # remove older cache entries of this same sample
+        stale_pattern = re.compile(re.escape(name) + r"-[0-9a-f]{32}\.wav")
+        for entry in os.listdir(sound_cache_dir):
+            if stale_pattern.fullmatch(entry) and sound_cache_dir + entry != cachefile:
+                os.remove(sound_cache_dir + entry)
+        sample.write_wav(cachefile + ".tmp")
+        os.replace(cachefile + ".tmp", cachefile)
+    except IOError:
+        # can't cache it, no problem
+        try:
+            os.remove(cachefile + ".tmp")
+        except IOError:
+            pass
+    return sample
+
+
+def load_sound_files(samples_to_load: Dict[str, Tuple[Union[str, Sample], int]]) -> Dict[str, Tuple[Union[str, Sample], int]]:
+    # decodes the sound files into samples. This doesn't touch the audio device,
+    # so unlike init_audio it can safely run in another thread.
+    if any(isinstance(smp, str) for smp, _ in samples_to_load.values()):
+        print("Loading sound files...")
+    loaded = {}     # type: Dict[str, Tuple[Union[str, Sample], int]]
+    for name, (filename, max_simultaneously) in samples_to_load.items():
+        if isinstance(filename, str):
+            loaded[name] = (load_sound_file(name, filename), max_simultaneously)
+        else:
+            loaded[name] = (filename, max_simultaneously)
+    return loaded
 
 
 class SoundEngine:
@@ -61,23 +119,8 @@ class SoundEngine:
         global samples
         samples.clear()
         self.output = Output(mixing="mix")
-        if any(isinstance(smp, str) for smp, _ in samples_to_load.values()):
-            print("Loading sound files...")
-        for name, (filename, max_simultaneously) in samples_to_load.items():
-            if isinstance(filename, Sample):
-                samples[name] = filename
-            else:
-                data = pkgutil.get_data(__name__, "sounds/" + filename)
-                if data:
-                    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".ogg")
-                    try:
-                        tmp.write(data)
-                        tmp.close()
-                        samples[name] = Sample(streaming.AudiofileToWavStream(tmp.name), name).stereo()
-                    finally:
-                        os.remove(tmp.name)
-                else:
-                    raise SystemExit("corrupt package; sound data is missing")
+        for name, (sample, max_simultaneously) in load_sound_files(samples_to_load).items():
+            samples[name] = sample
             self.output.set_sample_play_limit(name, max_simultaneously)
         print("Sound API initialized:", self.output.audio_api)
 
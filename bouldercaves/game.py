@@ -17,13 +17,76 @@ import tkinter.messagebox
 from tkinter import simpledialog
 import pkgutil
 import time
-from typing import Tuple, Sequence, List, Iterable, Callable, Optional
+import functools
+import concurrent.futures
+from typing import Tuple, Sequence, List, Iterable, Callable, Optional, Dict
 from .gamelogic import GameState, Direction, GameStatus, HighScores
 from .caves import colorpalette, Palette
-from . import audio, synthsamples, tiles, objects, bdcff
+from . import audio, tiles, objects, bdcff
 
 __version__ = "5.7.2"
 
+# rockford's sprite when moving or pushing left/right, by (horizontal direction, pushing)
+ROCKFORD_MOVING_SPRITES = {
+    (Direction.LEFT, False): objects.ROCKFORD.left,
+    (Direction.LEFT, True): objects.ROCKFORD.pushleft,
+    (Direction.RIGHT, False): objects.ROCKFORD.right,
+    (Direction.RIGHT, True): objects.ROCKFORD.pushright
+}   # type: Dict[Tuple[Direction, bool], objects.GameObject]
+
+# rockford's sprite when standing still, by (tapping, blinking)
+ROCKFORD_IDLE_SPRITES = {
+    (False, False): objects.ROCKFORD,
+    (True, False): objects.ROCKFORD.tap,
+    (False, True): objects.ROCKFORD.blink,
+    (True, True): objects.ROCKFORD.tapblink
+}   # type: Dict[Tuple[bool, bool], objects.GameObject]
+
+
+# the sound sample files and how many of each may be playing simultaneously
+SAMPLE_FILES = {
+    "music": ("bdmusic.ogg", 1),
+    "cover": ("cover.ogg", 1),
+    "crack": ("crack.ogg", 2),
+    "boulder": ("boulder.ogg", 4),
+    "finished": ("finished.ogg", 1),
+    "explosion": ("explosion.ogg", 2),
+    "voodoo_explosion": ("voodoo_explosion.ogg", 2),
+    "extra_life": ("bonus_life.ogg", 1),
+    "walk_empty": ("walk_empty.ogg", 2),
+    "walk_dirt": ("walk_dirt.ogg", 2),
+    "collect_diamond": ("collectdiamond.ogg", 1),
+    "box_push": ("box_push.ogg", 2),
+    "amoeba": ("amoeba.ogg", 1),
+    "slime": ("slime.ogg", 1),
+    "magic_wall": ("magic_wall.ogg", 1),
+    "game_over": ("game_over.ogg", 1),
+    "diamond1": ("diamond1.ogg", 2),
+    "diamond2": ("diamond2.ogg", 2),
+    "diamond3": ("diamond3.ogg", 2),
+    "diamond4": ("diamond4.ogg", 2),
+    "diamond5": ("diamond5.ogg", 2),
+    "diamond6": ("diamond6.ogg", 2),
+    "timeout1": ("timeout1.ogg", 1),
+    "timeout2": ("timeout2.ogg", 1),
+    "timeout3": ("timeout3.ogg", 1),
+    "timeout4": ("timeout4.ogg", 1),
+    "timeout5": ("timeout5.ogg", 1),
+    "timeout6": ("timeout6.ogg", 1),
+    "timeout7": ("timeout7.ogg", 1),
+    "timeout8": ("timeout8.ogg", 1),
+    "timeout9": ("timeout9.ogg", 1),
+}   # type: Dict[str, Tuple[str, int]]
+
+
+@functools.lru_cache(maxsize=16)
+def popup_border_tiles(width: int, top: bool) -> Tuple[int, ...]:
+    if top:
+        left, right = objects.STEELSLOPEDUPLEFT, objects.STEELSLOPEDUPRIGHT
+    else:
+        left, right = objects.STEELSLOPEDDOWNLEFT, objects.STEELSLOPEDDOWNRIGHT
+    return (left.tile(),) + (objects.STEEL.tile(),) * (width - 2) + (right.tile(),)
+
 
 class BoulderWindow(tkinter.Tk):
     update_fps = 30
@@ -55,6 +118,9 @@ class BoulderWindow(tkinter.Tk):
         self.resizable(0, 0)
         self.configure(borderwidth=16, background="black")
         self.wm_title(title)
+        # sets the image of a list of canvas items, this way a whole frame is drawn with a single call into Tcl
+        self.tk.eval("proc bouldercaves_drawtiles {canvas items_and_images} "
+                     "{foreach {item image} $items_and_images {$canvas itemconfigure $item -image $image}}")
         self.appicon = tkinter.PhotoImage(data=pkgutil.get_data(__name__, "gfx/gdash_icon_48.gif"))
         self.wm_iconphoto(self, self.appicon)
         if sys.platform == "win32":
@@ -102,6 +168,10 @@ class BoulderWindow(tkinter.Tk):
         self.graphics_frame = 0
         self.popup_frame = 0
         self.last_demo_or_highscore_frame = 0
+
+    def create_gamestate(self) -> None:
+        # this is not done in __init__ because the game state plays sounds right away,
+        # so the audio system has to be initialized first.
         self.gamestate = GameState(self)
 
     def destroy(self) -> None:
@@ -131,7 +201,8 @@ class BoulderWindow(tkinter.Tk):
             self.game_update_dt -= self.gamestate.update_timestep
             self.update_game()
         self.graphics_update_dt += dt
-        if self.gamestate.game_status in (GameStatus.REVEALING_DEMO, GameStatus.REVEALING_PLAY) and not self.popup_tiles_save:
+        revealing = self.gamestate.game_status in (GameStatus.REVEALING_DEMO, GameStatus.REVEALING_PLAY) and not self.popup_tiles_save
+        if revealing:
             self.do_reveal()
         if self.graphics_update_dt > self.update_timestep:
             self.graphics_update_dt -= self.update_timestep
@@ -139,7 +210,15 @@ class BoulderWindow(tkinter.Tk):
                 print("Gfx update too slow to reach {:d} fps!".format(self.update_fps))
             self.repaint()
         self.gfxupdate_starttime = now
-        self.after(1000 // 60, self.tick_loop)
+        if revealing:
+            # the speed of the reveal animation depends on the tick rate, keep that constant
+            delay = 1000 // 60
+        else:
+            # sleep until the next graphics or game update is due, instead of polling the clock
+            next_update = min(self.update_timestep - self.graphics_update_dt,
+                              self.gamestate.update_timestep - self.game_update_dt)
+            delay = min(max(1, math.ceil(next_update * 1000)), 1000 // self.update_fps)
+        self.after(delay, self.tick_loop)
 
     def keypress(self, event) -> None:
         if event.keysym.startswith("Shift") or event.state & 1:
@@ -229,26 +308,25 @@ class BoulderWindow(tkinter.Tk):
         self.scroll_focuscell_into_view()
         if self.smallwindow and self.gamestate.game_status == GameStatus.WAITING and self.popup_frame < self.graphics_frame:
             # move the waiting screen (title screen) around so you can see it all :)
+            # (sin(1.5pi + t) == -cos(t) and cos(pi + t) == -cos(t), so both are a plain cosine)
             wavew, waveh = tiles.tile2pixels(self.playfield_columns - self.visible_columns, self.playfield_rows - self.visible_rows)
-            x = (1 + math.sin(1.5 * math.pi + self.graphics_frame / self.update_fps)) * wavew / 2
-            y = (1 + math.cos(math.pi + self.graphics_frame / self.update_fps / 1.4)) * waveh / 2
+            t = self.graphics_frame / self.update_fps
+            x = (1 - math.cos(t)) * wavew / 2
+            y = (1 - math.cos(t / 1.4)) * waveh / 2
             self.scrollxypixels(x, y)
-        for index, tile in self.tilesheet_score.dirty():
-            self.scorecanvas.itemconfigure(self.cscore_tiles[index], image=self.tile_images[tile])
-        # smooth scroll
+        self.draw_canvas_tiles(self.scorecanvas, self.cscore_tiles, self.tilesheet_score.dirty())
+        # smooth scroll. The canvas is only ever scrolled from here, so it can simply be
+        # scrolled by the difference with its current position (the canvas has no scrollregion to confine it)
         if self.canvas.view_x != self.view_x:       # type: ignore
-            self.canvas.xview_moveto(0)
-            self.canvas.xview_scroll(self.view_x, tkinter.UNITS)
+            self.canvas.xview_scroll(self.view_x - self.canvas.view_x, tkinter.UNITS)      # type: ignore
             self.canvas.view_x = self.view_x        # type: ignore
         if self.canvas.view_y != self.view_y:       # type: ignore
-            self.canvas.yview_moveto(0)
-            self.canvas.yview_scroll(self.view_y, tkinter.UNITS)
+            self.canvas.yview_scroll(self.view_y - self.canvas.view_y, tkinter.UNITS)      # type: ignore
             self.canvas.view_y = self.view_y        # type: ignore
         self.tilesheet.set_view(self.view_x // 16, self.view_y // 16)
 
         if self.popup_frame > self.graphics_frame:
-            for index, tile in self.tilesheet.dirty():
-                self.canvas.itemconfigure(self.c_tiles[index], image=self.tile_images[tile])
+            self.draw_canvas_tiles(self.canvas, self.c_tiles, self.tilesheet.dirty())
             return
         elif self.popup_tiles_save:
             self.popup_close()
@@ -256,53 +334,64 @@ class BoulderWindow(tkinter.Tk):
         if self.gamestate.game_status in (GameStatus.REVEALING_PLAY, GameStatus.REVEALING_DEMO):
             return
 
-        if self.gamestate.rockford_cell:
+        gamestate = self.gamestate
+        set_tile = self.tilesheet.set_tile
+        graphics_frame = self.graphics_frame
+        update_fps = self.update_fps
+        rockford_cell = gamestate.rockford_cell
+        if rockford_cell:
             # is rockford moving or pushing left/right?
-            rockford_sprite = objects.ROCKFORD   # type: objects.GameObject
+            movement = gamestate.movement
+            xdirection = movement.direction
+            if xdirection in (Direction.UP, Direction.DOWN):
+                xdirection = movement.lastXdir
+            rockford_sprite = ROCKFORD_MOVING_SPRITES.get((xdirection, movement.pushing))
+            if rockford_sprite is None:
+                # handle rockford idle state/animation
+                rockford_sprite = ROCKFORD_IDLE_SPRITES[gamestate.idle["tap"], gamestate.idle["blink"]]
             animframe = 0
-            if self.gamestate.movement.direction == Direction.LEFT or \
-                    (self.gamestate.movement.direction in (Direction.UP, Direction.DOWN) and
-                     self.gamestate.movement.lastXdir == Direction.LEFT):
-                if self.gamestate.movement.pushing:
-                    rockford_sprite = objects.ROCKFORD.pushleft
-                else:
-                    rockford_sprite = objects.ROCKFORD.left
-            elif self.gamestate.movement.direction == Direction.RIGHT or \
-                    (self.gamestate.movement.direction in (Direction.UP, Direction.DOWN) and
-                     self.gamestate.movement.lastXdir == Direction.RIGHT):
-                if self.gamestate.movement.pushing:
-                    rockford_sprite = objects.ROCKFORD.pushright
-                else:
-                    rockford_sprite = objects.ROCKFORD.right
-            # handle rockford idle state/animation
-            elif self.gamestate.idle["tap"] and self.gamestate.idle["blink"]:
-                rockford_sprite = objects.ROCKFORD.tapblink
-            elif self.gamestate.idle["tap"]:
-                rockford_sprite = objects.ROCKFORD.tap
-            elif self.gamestate.idle["blink"]:
-                rockford_sprite = objects.ROCKFORD.blink
             if rockford_sprite.sframes:
-                animframe = int(rockford_sprite.sfps / self.update_fps *
-                                (self.graphics_frame - self.gamestate.rockford_cell.anim_start_gfx_frame)) % rockford_sprite.sframes
-            self.tilesheet[self.gamestate.rockford_cell.x, self.gamestate.rockford_cell.y] = rockford_sprite.tile(animframe)
+                animframe = int(rockford_sprite.sfps / update_fps *
+                                (graphics_frame - rockford_cell.anim_start_gfx_frame)) % rockford_sprite.sframes
+            set_tile(rockford_cell.index, rockford_sprite.tile(animframe))
         # other animations:
-        for cell in self.gamestate.cells_with_animations():
+        # cells with the same object whose animation started at the same time show the same tile,
+        # so that is only calculated once per frame (most diamonds, amoeba etc. animate in sync)
+        anim_tiles = {}     # type: Dict[Tuple[objects.GameObject, int], Tuple[int, int]]
+        for cell in gamestate.cells_with_animations():
             obj = cell.obj
             if obj is objects.MAGICWALL:
-                if not self.gamestate.magicwall["active"]:
+                if not gamestate.magicwall["active"]:
                     obj = objects.BRICK
-            animframe = int(obj.sfps / self.update_fps * (self.graphics_frame - cell.anim_start_gfx_frame))
-            self.tilesheet[cell.x, cell.y] = obj.tile(animframe)
+            anim_key = (obj, cell.anim_start_gfx_frame)
+            if anim_key in anim_tiles:
+                animframe, tile = anim_tiles[anim_key]
+            else:
+                animframe = int(obj.sfps / update_fps * (graphics_frame - cell.anim_start_gfx_frame))
+                tile = obj.tile(animframe)
+                anim_tiles[anim_key] = (animframe, tile)
+            set_tile(cell.index, tile)
             if animframe >= obj.sframes and obj.anim_end_callback:
                 # the animation reached the last frame
                 obj.anim_end_callback(cell)
         # flash
-        if self.gamestate.flash > self.gamestate.frame:
-            self.configure(background=self.tkcolor(15) if self.graphics_frame % 2 else self.tkcolor(0))
-        elif self.gamestate.flash > 0:
+        if gamestate.flash > gamestate.frame:
+            self.configure(background=self.tkcolor(15) if graphics_frame % 2 else self.tkcolor(0))
+        elif gamestate.flash > 0:
             self.configure(background="black")
-        for index, tile in self.tilesheet.dirty():
-            self.canvas.itemconfigure(self.c_tiles[index], image=self.tile_images[tile])
+        self.draw_canvas_tiles(self.canvas, self.c_tiles, self.tilesheet.dirty())
+
+    def draw_canvas_tiles(self, canvas: tkinter.Canvas, canvas_tiles: Sequence[str], dirty: Iterable[Tuple[int, int]]) -> None:
+        # set the image of the canvas item of every dirty tile.
+        # this calls Tk directly because canvas.itemconfigure() does a lot of option processing per call,
+        # which is noticeable when hundreds of tiles change in one frame (while scrolling for instance).
+        # all items and their new images are passed to Tcl in one list, see the drawtiles proc created in __init__.
+        tile_images = self.tile_images
+        items_and_images = []   # type: List[object]
+        for index, tile in dirty:
+            items_and_images += (canvas_tiles[index], tile_images[tile])
+        if items_and_images:
+            canvas.tk.call("bouldercaves_drawtiles", str(canvas), tuple(items_and_images))
 
     def create_colored_tiles(self, colors: Palette) -> None:
         if self.c64colors:
@@ -329,18 +418,21 @@ class BoulderWindow(tkinter.Tk):
         self.playfield_rows = height
         self.canvas.delete(tkinter.ALL)
         self.c_tiles.clear()
+        # the screen coordinates of every tile column and row are calculated once, rather than for every tile
+        vcols = self.visible_columns if not self.smallwindow else 2 * self.visible_columns
+        column_sx = [self.physcoor(*tiles.tile2pixels(x, 0))[0] for x in range(max(self.playfield_columns, vcols))]
+        row_sy = [self.physcoor(*tiles.tile2pixels(0, y))[1] for y in range(max(self.playfield_rows, 2))]
         for y in range(self.playfield_rows):
+            sy = row_sy[y]
             for x in range(self.playfield_columns):
-                sx, sy = self.physcoor(*tiles.tile2pixels(x, y))
-                tile = self.canvas.create_image(sx, sy, image=self.tile_images[0], anchor=tkinter.NW, tags="tile")
+                tile = self.canvas.create_image(column_sx[x], sy, image=self.tile_images[0], anchor=tkinter.NW, tags="tile")
                 self.c_tiles.append(tile)
         # create the images on the score canvas for all tiles (fixed position):
         self.scorecanvas.delete(tkinter.ALL)
         self.cscore_tiles.clear()
-        vcols = self.visible_columns if not self.smallwindow else 2 * self.visible_columns
         for y in range(2):
             for x in range(vcols):
-                sx, sy = self.physcoor(*tiles.tile2pixels(x, y))
+                sx, sy = column_sx[x], row_sy[y]
                 if self.smallwindow:
                     sx //= 2
                     sy //= 2
@@ -355,7 +447,7 @@ class BoulderWindow(tkinter.Tk):
             self.canvas.configure(background="#{:06x}".format(screencolorrgb))
 
     def set_canvas_tile(self, x: int, y: int, obj: objects.GameObject) -> None:
-        self.tilesheet[x, y] = obj.tile()
+        self.tilesheet.set_tile(x + self.tilesheet.width * y, obj.tile())
 
     def set_scorebar_tiles(self, x: int, y: int, tiles: Sequence[int]) -> None:
         self.tilesheet_score.set_tiles(x, y, tiles)
@@ -364,9 +456,9 @@ class BoulderWindow(tkinter.Tk):
         self.tilesheet.set_tiles(0, 0, [objects.DIRT2.tile()] * self.playfield_columns * self.playfield_rows)
 
     def prepare_reveal(self) -> None:
-        c = objects.COVERED.tile()
-        for c_tile in self.c_tiles:
-            self.canvas.itemconfigure(c_tile, image=self.tile_images[c])
+        # all playfield tiles get the 'covered' tag, so the cover animation can update all of them in one call.
+        self.canvas.addtag_withtag("covered", "tile")
+        self.canvas.itemconfigure("covered", image=self.tile_images[objects.COVERED.tile()])
         self.tiles_revealed = bytearray(len(self.c_tiles))
 
     def do_reveal(self) -> None:
@@ -374,18 +466,20 @@ class BoulderWindow(tkinter.Tk):
         if self.graphics_frame % 2 == 0:
             return
         times = 1 if self.playfield_columns < 44 else 2
+        revealed = []   # type: List[Tuple[int, int]]
         for _ in range(0, times):
             for y in range(0, self.playfield_rows):
                 x = random.randrange(0, self.playfield_columns)
-                tile = self.tilesheet[x, y]
                 idx = x + self.playfield_columns * y
+                if self.tiles_revealed[idx]:
+                    continue    # towards the end most random picks hit a tile that is already uncovered
                 self.tiles_revealed[idx] = 1
-                self.canvas.itemconfigure(self.c_tiles[idx], image=self.tile_images[tile])
+                self.canvas.dtag(self.c_tiles[idx], "covered")
+                revealed.append((idx, self.tilesheet[x, y]))
+        # the uncovered tiles get their real image all at once
+        self.draw_canvas_tiles(self.canvas, self.c_tiles, revealed)
         # animate the cover-tiles
-        cover_tile = objects.COVERED.tile(self.graphics_frame)
-        for i, c_tile in enumerate(self.c_tiles):
-            if self.tiles_revealed[i] == 0:
-                self.canvas.itemconfigure(c_tile, image=self.tile_images[cover_tile])
+        self.canvas.itemconfigure("covered", image=self.tile_images[objects.COVERED.tile(self.graphics_frame)])
 
     def physcoor(self, sx: int, sy: int) -> Tuple[int, int]:
         return int(sx * self.scalexy), int(sy * self.scalexy)
@@ -475,13 +569,12 @@ class BoulderWindow(tkinter.Tk):
             x, y, popupwidth, popupheight,
             self.tilesheet.get_tiles(x, y, popupwidth, popupheight)
         )
-        self.tilesheet.set_tiles(x, y, [objects.STEELSLOPEDUPLEFT.tile()] +
-                                 [objects.STEEL.tile()] * (popupwidth - 2) + [objects.STEELSLOPEDUPRIGHT.tile()])
+        # every row of the popup is written with a single set_tiles call, the border rows are cached
+        steel = (objects.STEEL.tile(),)
+        self.tilesheet.set_tiles(x, y, popup_border_tiles(popupwidth, True))
         y += 1
         if not self.smallwindow:
-            self.tilesheet.set_tiles(x + 1, y, tiles.text2tiles(bchar * (popupwidth - 2)))
-            self.tilesheet[x, y] = objects.STEEL.tile()
-            self.tilesheet[x + popupwidth - 1, y] = objects.STEEL.tile()
+            self.tilesheet.set_tiles(x, y, steel + tiles.text2tiles(bchar * (popupwidth - 2)) + steel)
             y += 1
         lines.insert(0, "")
         if not self.smallwindow:
@@ -490,17 +583,12 @@ class BoulderWindow(tkinter.Tk):
             if not line:
                 line = " "
             line_tiles = tiles.text2tiles(bchar + " " + line.ljust(width) + " " + bchar)
-            self.tilesheet[x, y] = objects.STEEL.tile()
-            self.tilesheet[x + popupwidth - 1, y] = objects.STEEL.tile()
-            self.tilesheet.set_tiles(x + 1, y, line_tiles)
+            self.tilesheet.set_tiles(x, y, steel + line_tiles + steel)
             y += 1
         if not self.smallwindow:
-            self.tilesheet[x, y] = objects.STEEL.tile()
-            self.tilesheet[x + popupwidth - 1, y] = objects.STEEL.tile()
-            self.tilesheet.set_tiles(x + 1, y, tiles.text2tiles(bchar * (popupwidth - 2)))
+            self.tilesheet.set_tiles(x, y, steel + tiles.text2tiles(bchar * (popupwidth - 2)) + steel)
             y += 1
-        self.tilesheet.set_tiles(x, y, [objects.STEELSLOPEDDOWNLEFT.tile()] +
-                                 [objects.STEEL.tile()] * (popupwidth - 2) + [objects.STEELSLOPEDDOWNRIGHT.tile()])
+        self.tilesheet.set_tiles(x, y, popup_border_tiles(popupwidth, False))
         self.popup_frame = int(self.graphics_frame + self.update_fps * duration)
         self.on_popup_closed = on_close
 
@@ -556,7 +644,8 @@ def start(sargs: Sequence[str]=None) -> None:
         editor.start()
         raise SystemExit
 
-    # validate required libraries
+    # validate required libraries. This opens the sound device, so it stays on the main thread:
+    # not every audio backend (portaudio on macOS for instance) can be initialized from another thread.
     audio.check_api()
     args.c64colors |= args.authentic
     if args.c64colors:
@@ -567,41 +656,10 @@ def start(sargs: Sequence[str]=None) -> None:
         print("You can use the '-c' or '--c64colors' argument to get the original C-64 colors.")
 
     # initialize the audio system
-    samples = {
-        "music": ("bdmusic.ogg", 1),
-        "cover": ("cover.ogg", 1),
-        "crack": ("crack.ogg", 2),
-        "boulder": ("boulder.ogg", 4),
-        "finished": ("finished.ogg", 1),
-        "explosion": ("explosion.ogg", 2),
-        "voodoo_explosion": ("voodoo_explosion.ogg", 2),
-        "extra_life": ("bonus_life.ogg", 1),
-        "walk_empty": ("walk_empty.ogg", 2),
-        "walk_dirt": ("walk_dirt.ogg", 2),
-        "collect_diamond": ("collectdiamond.ogg", 1),
-        "box_push": ("box_push.ogg", 2),
-        "amoeba": ("amoeba.ogg", 1),
-        "slime": ("slime.ogg", 1),
-        "magic_wall": ("magic_wall.ogg", 1),
-        "game_over": ("game_over.ogg", 1),
-        "diamond1": ("diamond1.ogg", 2),
-        "diamond2": ("diamond2.ogg", 2),
-        "diamond3": ("diamond3.ogg", 2),
-        "diamond4": ("diamond4.ogg", 2),
-        "diamond5": ("diamond5.ogg", 2),
-        "diamond6": ("diamond6.ogg", 2),
-        "timeout1": ("timeout1.ogg", 1),
-        "timeout2": ("timeout2.ogg", 1),
-        "timeout3": ("timeout3.ogg", 1),
-        "timeout4": ("timeout4.ogg", 1),
-        "timeout5": ("timeout5.ogg", 1),
-        "timeout6": ("timeout6.ogg", 1),
-        "timeout7": ("timeout7.ogg", 1),
-        "timeout8": ("timeout8.ogg", 1),
-        "timeout9": ("timeout9.ogg", 1),
-    }
+    samples = dict(SAMPLE_FILES)    # a copy, the synthesizer replaces the entries
 
     if args.synth:
+        from . import synthsamples     # only needed (and imported) when the synthesizer is used
         print("Pre-synthesizing sounds...")
         diamond = synthsamples.Diamond()   # is randomized everytime it is played
         synthesized = {
@@ -637,25 +695,31 @@ def start(sargs: Sequence[str]=None) -> None:
             "timeout8": synthsamples.Timeout(8),
             "timeout9": synthsamples.Timeout(9),
         }
-        assert len(synthesized.keys() - samples.keys()) == 0
-        missing = samples.keys() - synthesized.keys()
-        if missing:
-            raise SystemExit("Synths missing for: " + str(missing))
+        if synthesized.keys() != samples.keys():
+            # (the differences are only computed when there actually is a mismatch)
+            assert len(synthesized.keys() - samples.keys()) == 0
+            raise SystemExit("Synths missing for: " + str(samples.keys() - synthesized.keys()))
         for name, sample in synthesized.items():
             max_simul = samples[name][1]
             samples[name] = (sample, max_simul)     # type: ignore
 
     if os.name == "nt":
         audio.prepare_oggdec_exe()
-    audio.init_audio(samples)
+    # the sound files are decoded in the background while the window and its graphics are created
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    sound_files = executor.submit(audio.load_sound_files, samples)
+    executor.shutdown(wait=False)
     title = "Boulder Caves {version:s} {sound:s} {playtest:s} - by Irmen de Jong"\
         .format(version=__version__,
                 sound="[using synthesizer]" if args.synth else "",
                 playtest="[playtesting]" if args.playtest else "")
     window = BoulderWindow(title, args.fps, args.size + 1,
-                           c64colors=args.c64colors | args.authentic,
+                           c64colors=args.c64colors,
                            c64_alternate_tiles=args.othertiles,
                            smallwindow=args.authentic)
+    # the audio system itself is initialized on the main thread, not every audio backend is thread safe
+    audio.init_audio(sound_files.result())
+    window.create_gamestate()
     if args.game:
         window.gamestate.use_bdcff(args.game)
     if args.level:
@@ -7,12 +7,15 @@ Written by Irmen de Jong (irmen@razorvine.net)
 License: GNU GPL 3.0, see LICENSE
 """
 
+import array
+import bisect
 import datetime
+import functools
 import random
 import json
 from enum import Enum
-from typing import List, Optional, Sequence, Generator
-from .objects import Direction
+from typing import List, Optional, Sequence, Set, Tuple
+from .objects import Direction, ROTATE90LEFT, ROTATE90RIGHT
 from . import caves, audio, user_data_dir, tiles, objects
 
 
@@ -28,6 +31,13 @@ class GameStatus(Enum):
     HIGHSCORE = 9
 
 
+@functools.lru_cache(maxsize=32)
+def _load_scores(name: str) -> List[List]:
+    # cached per process, so switching back and forth between cave sets doesn't hit the disk every time
+    with open(user_data_dir + "highscores-{:s}.json".format(name), "rt") as scorefile:
+        return json.load(scorefile)
+
+
 class HighScores:
     # high score table is 8 entries, name len=7 max, score max=999999
     # table starts with score then the name, for easy sorting
@@ -35,60 +45,131 @@ class HighScores:
 
     def __init__(self, cavesetname) -> None:
         self.name = cavesetname.lower().replace(' ', '_').replace('.', '_')
+        self._dirty = False
         self.load()
 
     def __iter__(self):
         yield from self.scores
 
     def save(self) -> None:
+        if not self._dirty:
+            return   # nothing changed since it was loaded or last saved
         with open(user_data_dir + "highscores-{:s}.json".format(self.name), "wt") as out:
             json.dump(self.scores, out)
+        self._dirty = False
+        _load_scores.cache_clear()
 
     def load(self) -> None:
         try:
-            with open(user_data_dir + "highscores-{:s}.json".format(self.name), "rt") as scorefile:
-                self.scores = json.load(scorefile)
+            # copy the entries, the cached table itself must not be mutated
+            self.scores = [list(entry) for entry in _load_scores(self.name)]
         except FileNotFoundError:
             print("Using new high-score table.")
             self.scores = [[200, "idj"]] * 8
+            self._dirty = True
             self.save()
+        # the file could have been edited by hand, so make sure the table is sorted descending (by score only,
+        # equal scores keep their order). Then the negated scores are sorted ascending, for bisect.
+        self.scores.sort(key=lambda entry: entry[0], reverse=True)
+        self._neg_scores = [-score for score, _ in self.scores]
 
     def score_pos(self, playerscore: int) -> Optional[int]:
-        for pos, (score, _) in enumerate(self.scores, start=1):
-            if score < playerscore:
-                return pos
-        return None
+        # a score equal to an existing entry doesn't beat it, hence bisect_right
+        pos = bisect.bisect_right(self._neg_scores, -playerscore)
+        return pos + 1 if pos < len(self.scores) else None
 
     def add(self, name: str, score: int) -> None:
         pos = self.score_pos(score)
         if not pos:
             raise ValueError("score is not a new high score")
         self.scores.insert(pos - 1, [score, name])
+        self._neg_scores.insert(pos - 1, -score)
         self.scores = self.scores[:8]
+        self._neg_scores = self._neg_scores[:8]
+        self._dirty = True
+
+
+# the cells around an explosion that are affected by it (every direction except NOWHERE)
+EXPLOSION_DIRECTIONS = tuple(d for d in Direction if d != Direction.NOWHERE)
+
+# the directions amoeba can grow in, indexed by 2 random bits
+AMOEBA_GROWTH_DIRECTIONS = (Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT)
+RANDOM_POOL_SIZE = 8192
+
+
+# object categories used by the Cell predicates and the hot paths in the update loop.
+# these are created once here, rather than building a new set literal on every predicate call.
+EMPTY_OBJECTS = frozenset({objects.EMPTY, objects.BONUSBG, None})
+DIRT_OBJECTS = frozenset({objects.DIRTBALL, objects.DIRT, objects.DIRT2, objects.DIRTLOOSE,
+                          objects.DIRTSLOPEDDOWNLEFT, objects.DIRTSLOPEDDOWNRIGHT,
+                          objects.DIRTSLOPEDUPLEFT, objects.DIRTSLOPEDUPRIGHT})
+BOULDER_OBJECTS = frozenset({objects.BOULDER, objects.MEGABOULDER, objects.CHASINGBOULDER, objects.FLYINGBOULDER})
+WALL_OBJECTS = frozenset({objects.HEXPANDINGWALL, objects.VEXPANDINGWALL, objects.BRICK,
+                          objects.MAGICWALL, objects.STEEL, objects.STEELWALLBIRTH,
+                          objects.BRICKSLOPEDDOWNRIGHT, objects.BRICKSLOPEDDOWNLEFT,
+                          objects.BRICKSLOPEDUPRIGHT, objects.BRICKSLOPEDUPLEFT,
+                          objects.STEELSLOPEDDOWNLEFT, objects.STEELSLOPEDDOWNRIGHT,
+                          objects.STEELSLOPEDUPLEFT, objects.STEELSLOPEDUPRIGHT})
+DIAMOND_OBJECTS = frozenset({objects.DIAMOND, objects.FLYINGDIAMOND})
+AMOEBA_OBJECTS = frozenset({objects.AMOEBA, objects.AMOEBARECTANGLE})
+AMOEBA_GROWTH_OBJECTS = EMPTY_OBJECTS | DIRT_OBJECTS     # what amoeba can grow into
+FIREFLY_OBJECTS = frozenset({objects.FIREFLY, objects.ALTFIREFLY})
+BUTTERFLY_OBJECTS = frozenset({objects.BUTTERFLY, objects.ALTBUTTERFLY})
+OUTBOX_OBJECTS = frozenset({objects.OUTBOXBLINKING, objects.OUTBOXHIDDENOPEN})
+CANFALL_OBJECTS = frozenset({objects.BOULDER, objects.SWEET, objects.DIAMONDKEY, objects.BOMB,
+                             objects.IGNITEDBOMB, objects.KEY1, objects.KEY2, objects.KEY3,
+                             objects.DIAMOND, objects.MEGABOULDER, objects.SKELETON, objects.NITROFLASK,
+                             objects.DIRTBALL, objects.COCONUT, objects.ROCKETLAUNCHER})
+# the objects that do something in the cave sweep, all other cells are inert (unless they're falling)
+ACTIVE_OBJECTS = CANFALL_OBJECTS | FIREFLY_OBJECTS | BUTTERFLY_OBJECTS | AMOEBA_OBJECTS | \
+    frozenset({objects.INBOXBLINKING, objects.ROCKFORD, objects.OUTBOXCLOSED, objects.OUTBOXHIDDEN,
+               objects.BONUSBG, objects.HEXPANDINGWALL, objects.VEXPANDINGWALL})
+
+# demo move encoding
+DEMO_DIRECTIONS = {
+    0x0f: Direction.NOWHERE,
+    0x07: Direction.RIGHT,
+    0x0b: Direction.LEFT,
+    0x0d: Direction.DOWN,
+    0x0e: Direction.UP
+}
+
+# title screen symbols
+TITLE_OBJECTS = {
+    '*': objects.BRICK,
+    '/': objects.BRICKSLOPEDUPLEFT,
+    '\\': objects.BRICKSLOPEDUPRIGHT,
+    '@': objects.BRICKSLOPEDDOWNLEFT,
+    '$': objects.BRICKSLOPEDDOWNRIGHT,
+    '+': objects.FLYINGDIAMOND,
+    '#': objects.BOULDER,
+    'f': objects.ALTFIREFLY
+}
 
 
 class Cell:
-    __slots__ = ("obj", "x", "y", "frame", "falling", "direction", "anim_start_gfx_frame")
+    __slots__ = ("obj", "x", "y", "index", "frame", "falling", "direction", "anim_start_gfx_frame")
 
-    def __init__(self, obj: objects.GameObject, x: int, y: int) -> None:
+    def __init__(self, obj: objects.GameObject, x: int, y: int, index: int) -> None:
         self.obj = obj  # what object is in the cell
         self.x = x
         self.y = y
+        self.index = index  # position in the cave list, cells never move so this is fixed
         self.frame = 0
         self.falling = False
         self.direction = Direction.NOWHERE
         self.anim_start_gfx_frame = 0
 
     def __repr__(self):
-        return "<Cell {:s} @{:d},{:d}>".format(self.obj.name, self.x, self.y)
+        # note: obj can be None (which counts as empty), don't crash on that
+        return "<Cell {:s} @{:d},{:d} frame={:d}{:s}>".format(self.obj.name if self.obj else "None", self.x, self.y,
+                                                              self.frame, " falling" if self.falling else "")
 
     def isempty(self) -> bool:
-        return self.obj in {objects.EMPTY, objects.BONUSBG, None}
+        return self.obj in EMPTY_OBJECTS
 
     def isdirt(self) -> bool:
-        return self.obj in {objects.DIRTBALL, objects.DIRT, objects.DIRT2, objects.DIRTLOOSE,
-                            objects.DIRTSLOPEDDOWNLEFT, objects.DIRTSLOPEDDOWNRIGHT,
-                            objects.DIRTSLOPEDUPLEFT, objects.DIRTSLOPEDUPRIGHT}
+        return self.obj in DIRT_OBJECTS
 
     def isrockford(self) -> bool:
         return self.obj is objects.ROCKFORD
@@ -122,24 +203,16 @@ class Cell:
         return self.obj is objects.DIAMOND or self.obj is objects.FLYINGDIAMOND
 
     def isboulder(self) -> bool:
-        return self.obj in {objects.BOULDER, objects.MEGABOULDER, objects.CHASINGBOULDER, objects.FLYINGBOULDER}
+        return self.obj in BOULDER_OBJECTS
 
     def iswall(self) -> bool:
-        return self.obj in {objects.HEXPANDINGWALL, objects.VEXPANDINGWALL, objects.BRICK,
-                            objects.MAGICWALL, objects.STEEL, objects.STEELWALLBIRTH,
-                            objects.BRICKSLOPEDDOWNRIGHT, objects.BRICKSLOPEDDOWNLEFT,
-                            objects.BRICKSLOPEDUPRIGHT, objects.BRICKSLOPEDUPLEFT,
-                            objects.STEELSLOPEDDOWNLEFT, objects.STEELSLOPEDDOWNRIGHT,
-                            objects.STEELSLOPEDUPLEFT, objects.STEELSLOPEDUPRIGHT}
+        return self.obj in WALL_OBJECTS
 
     def isoutbox(self) -> bool:
-        return self.obj in (objects.OUTBOXBLINKING, objects.OUTBOXHIDDENOPEN)
+        return self.obj in OUTBOX_OBJECTS
 
     def canfall(self) -> bool:
-        return self.obj in {objects.BOULDER, objects.SWEET, objects.DIAMONDKEY, objects.BOMB,
-                            objects.IGNITEDBOMB, objects.KEY1, objects.KEY2, objects.KEY3,
-                            objects.DIAMOND, objects.MEGABOULDER, objects.SKELETON, objects.NITROFLASK,
-                            objects.DIRTBALL, objects.COCONUT, objects.ROCKETLAUNCHER}
+        return self.obj in CANFALL_OBJECTS
 
 
 # noinspection PyAttributeOutsideInit
@@ -158,6 +231,8 @@ class GameState:
         objects.DIAMONDBIRTH.anim_end_callback = self.end_diamondbirth
         self.highscores = HighScores(self.caveset.name)
         self.playtesting = False
+        self.random_pool = b""
+        self.random_pool_index = 0
         # and start the game on the title screen.
         self.restart()
 
@@ -211,8 +286,10 @@ class GameState:
         self.rockford_found_frame = -1
         self.movement = MovementInfo()
         self.flash = 0
+        self.scorebar_state = None   # type: Optional[tuple]
         # draw the 'title screen'
         self._create_cave(40, 22)
+        self.game.create_canvas_playfield_and_tilesheet(40, 22)     # the previous (demo) cave may have had another size
         self.draw_rectangle(objects.DIRT2, 0, 0, self.width, self.height, objects.EMPTY)
         title = r"""
 /**\           *\     *
@@ -235,17 +312,7 @@ class GameState:
             for x, c in enumerate(tl):
                 if c == ' ':
                     continue
-                obj = {
-                    '*': objects.BRICK,
-                    '/': objects.BRICKSLOPEDUPLEFT,
-                    '\\': objects.BRICKSLOPEDUPRIGHT,
-                    '@': objects.BRICKSLOPEDDOWNLEFT,
-                    '$': objects.BRICKSLOPEDDOWNRIGHT,
-                    '+': objects.FLYINGDIAMOND,
-                    '#': objects.BOULDER,
-                    'f': objects.ALTFIREFLY
-                }[c]
-                self.draw_single(obj, 3 + x, 1 + y)
+                self.draw_single(TITLE_OBJECTS[c], 3 + x, 1 + y)
 
         self.draw_line(objects.LAVA, 4, self.height - 3, self.width - 8, Direction.RIGHT)
         self.draw_line(objects.DIRT, 3, self.height - 2, self.width - 6, Direction.RIGHT)
@@ -257,7 +324,8 @@ class GameState:
     def _create_cave(self, width: int, height: int) -> None:
         self.width = width
         self.height = height
-        self._dirxy = {
+        # cell index offset for every direction, indexed by the direction
+        self._dirxy = tuple({
             Direction.NOWHERE: 0,
             Direction.UP: -self.width,
             Direction.DOWN: self.width,
@@ -267,11 +335,12 @@ class GameState:
             Direction.RIGHTUP: -self.width + 1,
             Direction.LEFTDOWN: self.width - 1,
             Direction.RIGHTDOWN: self.width + 1
-        }
-        self.cave = []   # type: List[Cell]
-        for y in range(self.height):
-            for x in range(self.width):
-                self.cave.append(Cell(objects.EMPTY, x, y))
+        }[d] for d in Direction)
+        # the cave is a flat row-major list so a neighbour is a fixed index offset away (see _dirxy)
+        self.cave = [Cell(objects.EMPTY, x, y, y * width + x)
+                     for y in range(height) for x in range(width)]   # type: List[Cell]
+        self.active_cells = set()   # type: Set[int]
+        self.animated_cells = set()   # type: Set[int]
 
     def use_bdcff(self, filename: str) -> None:
         self.caveset = caves.CaveSet(filename)
@@ -301,6 +370,7 @@ class GameState:
             cave.resize(self.game.visible_columns, self.game.visible_rows)
         self._create_cave(cave.width, cave.height)
         self.game.create_canvas_playfield_and_tilesheet(cave.width, cave.height)
+        self.scorebar_state = None    # the score bar may have been recreated, so force a redraw
         self.level_name = cave.name
         self.level_description = cave.description
         self.intermission = cave.intermission
@@ -369,11 +439,9 @@ class GameState:
     def check_initial_amoeba_dormant(self) -> None:
         if self.amoeba["dormant"]:
             for cell in self.cave:
-                if cell.isamoeba():
-                    if self.get(cell, Direction.UP).isempty() or self.get(cell, Direction.DOWN).isempty() \
-                            or self.get(cell, Direction.RIGHT).isempty() or self.get(cell, Direction.LEFT).isempty() \
-                            or self.get(cell, Direction.UP).isdirt() or self.get(cell, Direction.DOWN).isdirt() \
-                            or self.get(cell, Direction.RIGHT).isdirt() or self.get(cell, Direction.LEFT).isdirt():
+                if cell.obj in AMOEBA_OBJECTS:
+                    up, down, left, right = self.neighbours(cell)
+                    if not {up.obj, down.obj, left.obj, right.obj}.isdisjoint(AMOEBA_GROWTH_OBJECTS):
                         # amoeba can grow, so is not dormant
                         self.amoeba["dormant"] = False
                         audio.play_sample("amoeba", repeat=True)  # start playing amoeba sound
@@ -470,6 +538,10 @@ class GameState:
         cell.frame = self.frame   # make sure the new cell is not immediately scanned
         cell.anim_start_gfx_frame = self.graphics_frame_counter   # this makes sure that (new) anims start from the first frame
         cell.falling = False
+        if obj in ACTIVE_OBJECTS:
+            self.active_cells.add(cell.index)
+        if obj.sframes:
+            self.animated_cells.add(cell.index)
         if obj is objects.MAGICWALL:
             if not self.magicwall["active"]:
                 obj = objects.BRICK
@@ -482,16 +554,28 @@ class GameState:
     def get(self, cell: Cell, direction: Direction=Direction.NOWHERE) -> Cell:
         # retrieve the cell relative to the given cell
         # deals with wrapping around the up/bottom edge
-        cell_index = cell.x + cell.y * self.width + self._dirxy[direction]
+        cell_index = cell.index + self._dirxy[direction]
         if self.wraparound:
             if cell_index >= len(self.cave):
                 cell_index %= self.width        # wrap around lower edge
             elif cell_index < 0:
                 cell_index += len(self.cave)    # wrap around upper edge
         elif cell_index < 0 or cell_index >= len(self.cave):
-            return Cell(objects.STEEL, cell.x, cell.y)   # treat upper/lower edge as steel wall
+            return Cell(objects.STEEL, cell.x, cell.y, cell.index)   # treat upper/lower edge as steel wall
         return self.cave[cell_index]
 
+    def neighbours(self, cell: Cell) -> Tuple[Cell, Cell, Cell, Cell]:
+        # retrieve the up, down, left and right neighbour cells of the given cell in one go.
+        # cells that are not on the top or bottom row are looked up directly by index,
+        # only the edge rows need get()'s wraparound handling.
+        cell_index = cell.index
+        width = self.width
+        if width <= cell_index < len(self.cave) - width:
+            cave = self.cave
+            return cave[cell_index - width], cave[cell_index + width], cave[cell_index - 1], cave[cell_index + 1]
+        get = self.get
+        return get(cell, Direction.UP), get(cell, Direction.DOWN), get(cell, Direction.LEFT), get(cell, Direction.RIGHT)
+
     def move(self, cell: Cell, direction: Direction=Direction.NOWHERE) -> Optional[Cell]:
         # move the object in the cell to the given relative direction
         if direction == Direction.NOWHERE:
@@ -538,6 +622,7 @@ class GameState:
                     self.draw_single_cell(cell_under_wall, objects.DIAMOND)
                     audio.play_sample("diamond" + str(random.randint(1, 6)))
                 cell_under_wall.falling = True
+                self.active_cells.add(cell_under_wall.index)
         else:
             # magic wall is disabled, stuff falling on it just disappears (a sound is already played)
             self.clear_cell(cell)
@@ -554,7 +639,17 @@ class GameState:
                 cell_under_wall.falling = True
 
     def cells_with_animations(self) -> List[Cell]:
-        return [cell for cell in self.cave if cell.obj.sframes]
+        # only the cells that received an animated object are checked, not the whole cave.
+        # when nothing is animating, the graphics update has no per-cell work to do at all.
+        cave = self.cave
+        cells = []
+        for index in sorted(self.animated_cells):
+            cell = cave[index]
+            if cell.obj.sframes:
+                cells.append(cell)
+            else:
+                self.animated_cells.discard(index)
+        return cells
 
     def update(self, graphics_frame_counter: int) -> None:
         self.graphics_frame_counter = graphics_frame_counter    # we store this to properly sync up animation frames
@@ -572,31 +667,45 @@ class GameState:
         if self.game_status not in (GameStatus.PLAYING, GameStatus.DEMO):
             return
         if not self.level_won:
-            # sweep the cave
-            for cell in self.cave:
-                if cell.frame < self.frame:
-                    if cell.falling:
-                        self.update_falling(cell)
-                    elif cell.canfall():
-                        self.update_canfall(cell)
-                    elif cell.isfirefly():
+            # sweep the cave, in the original top-left to bottom-right order.
+            # only the cells that contain an active object are visited, the rest of the cave is inert.
+            # (attribute lookups are hoisted into locals because this loop runs for every cell, every frame)
+            cave = self.cave
+            active_cells = self.active_cells
+            frame = self.frame
+            update_falling = self.update_falling
+            update_canfall = self.update_canfall
+            INBOXBLINKING, ROCKFORD, OUTBOXCLOSED, OUTBOXHIDDEN, BONUSBG, HEXPANDINGWALL, VEXPANDINGWALL = \
+                objects.INBOXBLINKING, objects.ROCKFORD, objects.OUTBOXCLOSED, objects.OUTBOXHIDDEN, \
+                objects.BONUSBG, objects.HEXPANDINGWALL, objects.VEXPANDINGWALL
+            for index in sorted(active_cells):
+                cell = cave[index]
+                if cell.frame < frame:
+                    obj = cell.obj
+                    if obj not in ACTIVE_OBJECTS and not cell.falling:
+                        active_cells.discard(index)
+                    elif cell.falling:
+                        update_falling(cell)
+                    elif obj in CANFALL_OBJECTS:
+                        update_canfall(cell)
+                    elif obj in FIREFLY_OBJECTS:
                         self.update_firefly(cell)
-                    elif cell.isbutterfly():
+                    elif obj in BUTTERFLY_OBJECTS:
                         self.update_butterfly(cell)
-                    elif cell.obj is objects.INBOXBLINKING:
+                    elif obj is INBOXBLINKING:
                         self.update_inbox(cell)
-                    elif cell.isrockford():
+                    elif obj is ROCKFORD:
                         self.update_rockford(cell)
-                    elif cell.isamoeba():
+                    elif obj in AMOEBA_OBJECTS:
                         self.update_amoeba(cell)
-                    elif cell.obj is objects.OUTBOXCLOSED:
+                    elif obj is OUTBOXCLOSED:
                         self.update_outboxclosed(cell)
-                    elif cell.obj is objects.OUTBOXHIDDEN:
+                    elif obj is OUTBOXHIDDEN:
                         self.update_outboxhidden(cell)
-                    elif cell.obj is objects.BONUSBG:
-                        if self.bonusbg_frame < self.frame:
+                    elif obj is BONUSBG:
+                        if self.bonusbg_frame < frame:
                             self.draw_single_cell(cell, objects.EMPTY)
-                    elif cell.obj in (objects.HEXPANDINGWALL, objects.VEXPANDINGWALL):
+                    elif obj is HEXPANDINGWALL or obj is VEXPANDINGWALL:
                         self.update_expandingwall(cell)
         self.frame_end()
 
@@ -722,21 +831,25 @@ class GameState:
     def update_canfall(self, cell: Cell) -> None:
         # if the cell below this one is empty, or slime, the object starts to fall
         # (in case of slime, it only falls through ofcourse if the space below the slime is empty)
-        cellbelow = self.get(cell, Direction.DOWN)
-        if cellbelow.isempty():
+        # note: this and update_falling are called for every boulder and diamond, every frame,
+        # so they test the object below directly rather than via the Cell predicate methods.
+        get = self.get
+        below = get(cell, Direction.DOWN).obj
+        if below in EMPTY_OBJECTS:
             if not cell.falling:
                 self.fall_sound(cell)
                 cell.falling = True
-                self.update_falling(cell)
-        elif cellbelow.isslime():
+                # this is what update_falling() would do now, without looking up the cell below again
+                self.move(cell, Direction.DOWN)
+        elif below is objects.SLIME:
             cell.falling = True
-        elif cellbelow.isrounded():
-            if self.get(cell, Direction.LEFT).isempty() and self.get(cell, Direction.LEFTDOWN).isempty():
+        elif below.rounded:
+            if get(cell, Direction.LEFT).obj in EMPTY_OBJECTS and get(cell, Direction.LEFTDOWN).obj in EMPTY_OBJECTS:
                 self.fall_sound(cell)
                 new_cell = self.move(cell, Direction.LEFT)
                 if new_cell:
                     new_cell.falling = True
-            elif self.get(cell, Direction.RIGHT).isempty() and self.get(cell, Direction.RIGHTDOWN).isempty():
+            elif get(cell, Direction.RIGHT).obj in EMPTY_OBJECTS and get(cell, Direction.RIGHTDOWN).obj in EMPTY_OBJECTS:
                 self.fall_sound(cell)
                 new_cell = self.move(cell, Direction.RIGHT)
                 if new_cell:
@@ -744,23 +857,26 @@ class GameState:
 
     def update_falling(self, cell: Cell) -> None:
         # let the object fall down, explode stuff if explodable!
-        cellbelow = self.get(cell, Direction.DOWN)
-        if cellbelow.isempty():
+        get = self.get
+        below = get(cell, Direction.DOWN).obj
+        if below in EMPTY_OBJECTS:
             # cell below is empty, move down and continue falling
             self.move(cell, Direction.DOWN)
-        elif cellbelow.obj is objects.VOODOO and cell.obj is objects.DIAMOND:
+            return
+        rounded = below.rounded
+        if below is objects.VOODOO and cell.obj is objects.DIAMOND:
             self.clear_cell(cell)
             self.collect_diamond()  # voodoo doll catches falling diamond
-        elif cellbelow.isexplodable():
+        elif below.explodable:
             self.explode(cell, Direction.DOWN)
-        elif cellbelow.ismagic():
+        elif below is objects.MAGICWALL:
             self.do_magic(cell)
-        elif cellbelow.isslime():
+        elif below is objects.SLIME:
             self.do_slime(cell)
-        elif cellbelow.isrounded() and self.get(cell, Direction.LEFT).isempty() and self.get(cell, Direction.LEFTDOWN).isempty():
+        elif rounded and get(cell, Direction.LEFT).obj in EMPTY_OBJECTS and get(cell, Direction.LEFTDOWN).obj in EMPTY_OBJECTS:
             self.fall_sound(cell)
             self.move(cell, Direction.LEFT)
-        elif cellbelow.isrounded() and self.get(cell, Direction.RIGHT).isempty() and self.get(cell, Direction.RIGHTDOWN).isempty():
+        elif rounded and get(cell, Direction.RIGHT).obj in EMPTY_OBJECTS and get(cell, Direction.RIGHTDOWN).obj in EMPTY_OBJECTS:
             self.fall_sound(cell)
             self.move(cell, Direction.RIGHT)
         else:
@@ -771,47 +887,47 @@ class GameState:
         # if it hits Rockford or Amoeba it explodes
         # tries to rotate 90 degrees left and move to empty cell in new or original direction
         # if not possible rotate 90 right and wait for next update
-        newdir = cell.direction.rotate90left()
-        if self.get(cell, Direction.UP).isrockford() or self.get(cell, Direction.DOWN).isrockford() \
-                or self.get(cell, Direction.LEFT).isrockford() or self.get(cell, Direction.RIGHT).isrockford():
+        newdir = ROTATE90LEFT[cell.direction]
+        up, down, left, right = self.neighbours(cell)
+        # test the objects of all four neighbours at once instead of calling 12 predicates
+        neighbour_objs = {up.obj, down.obj, left.obj, right.obj}
+        if objects.ROCKFORD in neighbour_objs:
             self.explode(cell)
-        elif self.get(cell, Direction.UP).isamoeba() or self.get(cell, Direction.DOWN).isamoeba() \
-                or self.get(cell, Direction.LEFT).isamoeba() or self.get(cell, Direction.RIGHT).isamoeba():
+        elif not neighbour_objs.isdisjoint(AMOEBA_OBJECTS):
             self.explode(cell)
-        elif self.get(cell, Direction.UP).obj is objects.VOODOO or self.get(cell, Direction.DOWN).obj is objects.VOODOO \
-                or self.get(cell, Direction.LEFT).obj is objects.VOODOO or self.get(cell, Direction.RIGHT).obj is objects.VOODOO:
+        elif objects.VOODOO in neighbour_objs:
             self.explode(cell)
             self.death_by_voodoo = True
-        elif self.get(cell, newdir).isempty():
+        elif self.get(cell, newdir).obj in EMPTY_OBJECTS:
             new_cell = self.move(cell, newdir)
             if new_cell:
                 new_cell.direction = newdir
-        elif self.get(cell, cell.direction).isempty():
+        elif self.get(cell, cell.direction).obj in EMPTY_OBJECTS:
             self.move(cell, cell.direction)
         else:
-            cell.direction = cell.direction.rotate90right()
+            cell.direction = ROTATE90RIGHT[cell.direction]
 
     def update_butterfly(self, cell: Cell) -> None:
         # same as firefly except butterflies rotate in the opposite direction
-        newdir = cell.direction.rotate90right()
-        if self.get(cell, Direction.UP).isrockford() or self.get(cell, Direction.DOWN).isrockford() \
-                or self.get(cell, Direction.LEFT).isrockford() or self.get(cell, Direction.RIGHT).isrockford():
+        newdir = ROTATE90RIGHT[cell.direction]
+        up, down, left, right = self.neighbours(cell)
+        # test the objects of all four neighbours at once instead of calling 12 predicates
+        neighbour_objs = {up.obj, down.obj, left.obj, right.obj}
+        if objects.ROCKFORD in neighbour_objs:
             self.explode(cell)
-        elif self.get(cell, Direction.UP).isamoeba() or self.get(cell, Direction.DOWN).isamoeba() \
-                or self.get(cell, Direction.LEFT).isamoeba() or self.get(cell, Direction.RIGHT).isamoeba():
+        elif not neighbour_objs.isdisjoint(AMOEBA_OBJECTS):
             self.explode(cell)
-        elif self.get(cell, Direction.UP).obj is objects.VOODOO or self.get(cell, Direction.DOWN).obj is objects.VOODOO \
-                or self.get(cell, Direction.LEFT).obj is objects.VOODOO or self.get(cell, Direction.RIGHT).obj is objects.VOODOO:
+        elif objects.VOODOO in neighbour_objs:
             self.explode(cell)
             self.death_by_voodoo = True
-        elif self.get(cell, newdir).isempty():
+        elif self.get(cell, newdir).obj in EMPTY_OBJECTS:
             new_cell = self.move(cell, newdir)
             if new_cell:
                 new_cell.direction = newdir
-        elif self.get(cell, cell.direction).isempty():
+        elif self.get(cell, cell.direction).obj in EMPTY_OBJECTS:
             self.move(cell, cell.direction)
         else:
-            cell.direction = cell.direction.rotate90left()
+            cell.direction = ROTATE90LEFT[cell.direction]
 
     def update_inbox(self, cell: Cell) -> None:
         # after 4 blinks (=2 seconds), Rockford spawns in the inbox.
@@ -841,20 +957,32 @@ class GameState:
             self.draw_single_cell(cell, self.amoeba["dead"])    # type: ignore
         else:
             self.amoeba["size"] += 1        # type: ignore
-            if self.get(cell, Direction.UP).isempty() or self.get(cell, Direction.DOWN).isempty() \
-                    or self.get(cell, Direction.RIGHT).isempty() or self.get(cell, Direction.LEFT).isempty() \
-                    or self.get(cell, Direction.UP).isdirt() or self.get(cell, Direction.DOWN).isdirt() \
-                    or self.get(cell, Direction.RIGHT).isdirt() or self.get(cell, Direction.LEFT).isdirt():
-                self.amoeba["enclosed"] = False
-                if self.amoeba["dormant"]:
-                    # amoeba can grow, so is not dormant anymore
-                    self.amoeba["dormant"] = False
-                    audio.play_sample("amoeba", repeat=True)  # start playing amoeba sound
+            # the enclosure check is for the amoeba as a whole: once a single cell in this frame
+            # has been found that can grow, the other amoeba cells don't have to be checked anymore.
+            if self.amoeba["enclosed"] or self.amoeba["dormant"]:
+                up, down, left, right = self.neighbours(cell)
+                if not {up.obj, down.obj, left.obj, right.obj}.isdisjoint(AMOEBA_GROWTH_OBJECTS):
+                    self.amoeba["enclosed"] = False
+                    if self.amoeba["dormant"]:
+                        # amoeba can grow, so is not dormant anymore
+                        self.amoeba["dormant"] = False
+                        audio.play_sample("amoeba", repeat=True)  # start playing amoeba sound
             if self.timelimit:
-                grow = random.randint(1, 128) < 4 if self.amoeba["slow"] else random.randint(1, 4) == 1
-                direction = random.choice([Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT])
-                if grow and (self.get(cell, direction).isdirt() or self.get(cell, direction).isempty()):
-                    self.draw_single_cell(self.get(cell, direction), cell.obj)
+                # slow growth has a 3/128 chance (6/256), fast growth 1/4.
+                rnd = self.random_byte()
+                grow = rnd < 6 if self.amoeba["slow"] else rnd & 3 == 0
+                if grow:
+                    target = self.get(cell, AMOEBA_GROWTH_DIRECTIONS[self.random_byte() & 3])
+                    if target.obj in AMOEBA_GROWTH_OBJECTS:
+                        self.draw_single_cell(target, cell.obj)
+
+    def random_byte(self) -> int:
+        # random numbers are drawn in batches because amoeba needs them for every cell, every frame.
+        if self.random_pool_index >= len(self.random_pool):
+            self.random_pool = random.getrandbits(RANDOM_POOL_SIZE * 8).to_bytes(RANDOM_POOL_SIZE, "little")
+            self.random_pool_index = 0
+        self.random_pool_index += 1
+        return self.random_pool[self.random_pool_index - 1]
 
     def update_rockford(self, cell: Cell) -> None:
         self.rockford_cell = cell
@@ -936,6 +1064,14 @@ class GameState:
         #     self.game.tilesheet_score[10, 0] = objects.KEY2.spritex + objects.KEY2.spritey * self.game.tile_image_numcolumns
         # if self.keys["three"]:
         #     self.game.tilesheet_score[11, 0] = objects.KEY3.spritex + objects.KEY3.spritey * self.game.tile_image_numcolumns
+        # only redraw the score bar if something that is shown on it has changed.
+        # the remaining time is compared in whole seconds, it is only formatted when the bar is redrawn.
+        state = (self.level, self.lives, self.score, self.diamonds, self.diamonds_needed,
+                 self.diamondvalue_initial, self.diamondvalue_extra, self.timeremaining.seconds,
+                 self.game_status, self.level_name, self.intermission, self.playtesting)
+        if state == self.scorebar_state:
+            return
+        self.scorebar_state = state
         width = self.game.tilesheet_score.width
         if self.level < 1:
             # level has not been loaded yet (we're still at the title screen)
@@ -980,12 +1116,12 @@ class GameState:
         self.game.set_scorebar_tiles(0, 1, line_tiles[:40])  # line 2
 
     def fall_sound(self, cell: Cell, pushing: bool=False) -> None:
-        if cell.isboulder() or cell.iswall():
+        if cell.obj in BOULDER_OBJECTS or cell.obj in WALL_OBJECTS:
             if pushing:
                 audio.play_sample("box_push")
             else:
                 audio.play_sample("boulder")
-        elif cell.isdiamond():
+        elif cell.obj in DIAMOND_OBJECTS:
             audio.play_sample("diamond" + str(random.randint(1, 6)))
 
     def collect_diamond(self) -> None:
@@ -1009,10 +1145,11 @@ class GameState:
         if self.lives < 9:   # 9 is the maximum number of lives
             self.lives += 1
             audio.play_sample("extra_life")
-            for cell in self.cave:
-                if cell.obj is objects.EMPTY:
-                    self.draw_single_cell(cell, objects.BONUSBG)
-                    self.bonusbg_frame = self.frame + self.fps * 6   # sparkle for 6 seconds
+            empty_cells = [cell for cell in self.cave if cell.obj is objects.EMPTY]
+            for cell in empty_cells:
+                self.draw_single_cell(cell, objects.BONUSBG)
+            if empty_cells:
+                self.bonusbg_frame = self.frame + self.fps * 6   # sparkle for 6 seconds
 
     def add_extra_time(self, seconds: float) -> None:
         assert self.timelimit
@@ -1026,7 +1163,7 @@ class GameState:
             self.inbox_cell = None
             if self.diamonds_needed <= 0:
                 # need to subtract this from the current number of diamonds in the cave
-                numdiamonds = sum([1 for c in self.cave if c.isdiamond()])
+                numdiamonds = sum(1 for c in self.cave if c.obj in DIAMOND_OBJECTS)
                 self.diamonds_needed = max(0, numdiamonds + self.diamonds_needed)
 
     def end_explosion(self, cell: Cell) -> None:
@@ -1040,7 +1177,7 @@ class GameState:
     def explode(self, cell: Cell, direction: Direction=Direction.NOWHERE) -> None:
         explosion_sample = "explosion"
         explosioncell = self.get(cell, direction)
-        if explosioncell.isbutterfly():
+        if explosioncell.obj in BUTTERFLY_OBJECTS:
             explode_obj = objects.DIAMONDBIRTH
         else:
             explode_obj = objects.EXPLOSION
@@ -1049,20 +1186,22 @@ class GameState:
             self.draw_single_cell(explosioncell, objects.GRAVESTONE)
         else:
             self.draw_single_cell(explosioncell, explode_obj)
-        for direction in Direction:
-            if direction == Direction.NOWHERE:
-                continue
-            cell = self.get(explosioncell, direction)
-            if cell.isconsumable():
+        get = self.get
+        draw_single_cell = self.draw_single_cell
+        for direction in EXPLOSION_DIRECTIONS:
+            cell = get(explosioncell, direction)
+            if cell.obj.consumable:
                 if cell.obj is objects.VOODOO:
                     explosion_sample = "voodoo_explosion"
-                    self.draw_single_cell(cell, objects.GRAVESTONE)
+                    draw_single_cell(cell, objects.GRAVESTONE)
                 else:
-                    self.draw_single_cell(cell, explode_obj)
+                    draw_single_cell(cell, explode_obj)
         audio.play_sample(explosion_sample)
 
 
 class MovementInfo:
+    __slots__ = ("_direction", "lastXdir", "up", "down", "left", "right", "grab", "pushing")
+
     def __init__(self) -> None:
         self._direction = Direction.NOWHERE
         self.lastXdir = Direction.NOWHERE
@@ -1072,7 +1211,7 @@ class MovementInfo:
 
     @property
     def moving(self) -> bool:
-        return bool(self._direction != Direction.NOWHERE)
+        return self._direction != Direction.NOWHERE
 
     @property
     def direction(self) -> Direction:
@@ -1145,10 +1284,13 @@ class MovementInfo:
 class DemoMovementInfo(MovementInfo):
     # movement controller that doesn't respond to user input,
     # and instead plays a prerecorded sequence of moves.
+    __slots__ = ("demo_direction", "demo_moves", "demo_index", "demo_finished")
+
     def __init__(self, demo_moves: Sequence[int]) -> None:
         super().__init__()
         self.demo_direction = Direction.NOWHERE
         self.demo_moves = self.decompressed(demo_moves)
+        self.demo_index = 0
         self.demo_finished = False
 
     @property
@@ -1164,27 +1306,23 @@ class DemoMovementInfo(MovementInfo):
         pass
 
     def move_done(self) -> None:
-        try:
-            self.demo_direction = next(self.demo_moves)
-            if self.demo_direction == Direction.LEFT:
-                self.lastXdir = Direction.LEFT
-            elif self.demo_direction == Direction.RIGHT:
-                self.lastXdir = Direction.RIGHT
-        except StopIteration:
+        if self.demo_index >= len(self.demo_moves):
             self.demo_finished = True
             self.demo_direction = Direction.NOWHERE
-
-    def decompressed(self, demo: Sequence[int]) -> Generator[Direction, None, None]:
+            return
+        self.demo_direction = Direction(self.demo_moves[self.demo_index])
+        self.demo_index += 1
+        if self.demo_direction == Direction.LEFT:
+            self.lastXdir = Direction.LEFT
+        elif self.demo_direction == Direction.RIGHT:
+            self.lastXdir = Direction.RIGHT
+
+    def decompressed(self, demo: Sequence[int]) -> array.array:
+        # expand the run-length encoded demo into one direction value per move
+        moves = array.array('b')
         for step in demo:
             d = step & 0x0f
             if d == 0:
                 break
-            direction = {
-                0x0f: Direction.NOWHERE,
-                0x07: Direction.RIGHT,
-                0x0b: Direction.LEFT,
-                0x0d: Direction.DOWN,
-                0x0e: Direction.UP
-            }[d]
-            for _ in range(step >> 4):
-                yield direction
+            moves.extend([DEMO_DIRECTIONS[d]] * (step >> 4))
+        return moves
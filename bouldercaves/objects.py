@@ -7,11 +7,13 @@ Written by Irmen de Jong (irmen@razorvine.net)
 License: GNU GPL 3.0, see LICENSE
 """
 
-from enum import Enum
-from typing import Callable, Optional
+from enum import IntEnum
+from typing import Callable, Optional, Tuple
 
 
 class GameObject:
+    __slots__ = ("name", "rounded", "explodable", "consumable", "spritex", "spritey", "_tile", "sframes", "sfps", "anim_end_callback")
+
     def __init__(self, name: str, rounded: bool, explodable: bool, consumable: bool,
                  spritex: int, spritey: int, sframes: int=0, sfps: int=0,
                  anim_end_callback: Callable=None) -> None:
@@ -36,6 +38,8 @@ class GameObject:
 
 
 class RockfordGameObject(GameObject):
+    __slots__ = ("bomb", "blink", "tap", "tapblink", "left", "right", "stirring", "rocketlauncher", "pushleft", "pushright")
+
     def __init__(self, name: str, rounded: bool, explodable: bool, consumable: bool,
                  spritex: int, spritey: int, sframes: int=0, sfps: int=0,
                  anim_end_callback: Callable=None) -> None:
@@ -54,42 +58,49 @@ class RockfordGameObject(GameObject):
         self.pushright = dummy
 
 
-class Direction(Enum):
-    NOWHERE = ""
-    LEFT = "l"
-    RIGHT = "r"
-    UP = "u"
-    DOWN = "d"
-    LEFTUP = "lu"
-    RIGHTUP = "ru"
-    LEFTDOWN = "ld"
-    RIGHTDOWN = "rd"
+class Direction(IntEnum):
+    # the values are consecutive so they can be used to index lookup tables (see below)
+    NOWHERE = 0
+    LEFT = 1
+    RIGHT = 2
+    UP = 3
+    DOWN = 4
+    LEFTUP = 5
+    RIGHTUP = 6
+    LEFTDOWN = 7
+    RIGHTDOWN = 8
 
     def rotate90left(self: 'Direction') -> 'Direction':
-        return {
-            Direction.NOWHERE: Direction.NOWHERE,
-            Direction.UP: Direction.LEFT,
-            Direction.LEFT: Direction.DOWN,
-            Direction.DOWN: Direction.RIGHT,
-            Direction.RIGHT: Direction.UP,
-            Direction.LEFTUP: Direction.LEFTDOWN,
-            Direction.LEFTDOWN: Direction.RIGHTDOWN,
-            Direction.RIGHTDOWN: Direction.RIGHTUP,
-            Direction.RIGHTUP: Direction.LEFTUP
-        }[self]
+        return ROTATE90LEFT[self]
 
     def rotate90right(self: 'Direction') -> 'Direction':
-        return {
-            Direction.NOWHERE: Direction.NOWHERE,
-            Direction.UP: Direction.RIGHT,
-            Direction.RIGHT: Direction.DOWN,
-            Direction.DOWN: Direction.LEFT,
-            Direction.LEFT: Direction.UP,
-            Direction.LEFTUP: Direction.RIGHTUP,
-            Direction.RIGHTUP: Direction.RIGHTDOWN,
-            Direction.RIGHTDOWN: Direction.LEFTDOWN,
-            Direction.LEFTDOWN: Direction.LEFTUP
-        }[self]
+        return ROTATE90RIGHT[self]
+
+
+# direction rotation lookup tables, indexed by the direction
+ROTATE90LEFT = tuple({
+    Direction.NOWHERE: Direction.NOWHERE,
+    Direction.UP: Direction.LEFT,
+    Direction.LEFT: Direction.DOWN,
+    Direction.DOWN: Direction.RIGHT,
+    Direction.RIGHT: Direction.UP,
+    Direction.LEFTUP: Direction.LEFTDOWN,
+    Direction.LEFTDOWN: Direction.RIGHTDOWN,
+    Direction.RIGHTDOWN: Direction.RIGHTUP,
+    Direction.RIGHTUP: Direction.LEFTUP
+}[d] for d in Direction)     # type: Tuple[Direction, ...]
+
+ROTATE90RIGHT = tuple({
+    Direction.NOWHERE: Direction.NOWHERE,
+    Direction.UP: Direction.RIGHT,
+    Direction.RIGHT: Direction.DOWN,
+    Direction.DOWN: Direction.LEFT,
+    Direction.LEFT: Direction.UP,
+    Direction.LEFTUP: Direction.RIGHTUP,
+    Direction.RIGHTUP: Direction.RIGHTDOWN,
+    Direction.RIGHTDOWN: Direction.LEFTDOWN,
+    Direction.LEFTDOWN: Direction.LEFTUP
+}[d] for d in Direction)    # type: Tuple[Direction, ...]
 
 
 # row 0
@@ -8,6 +8,7 @@ License: GNU GPL 3.0, see LICENSE
 """
 
 import array
+import functools
 import io
 import pkgutil
 from typing import Tuple, Union, Iterable, Sequence
@@ -21,7 +22,7 @@ class Tilesheet:
     For optimized rendering, it tracks 'dirty' tiles.
     """
     def __init__(self, width: int, height: int, view_width: int, view_height: int) -> None:
-        self.tiles = array.array('H', [0] * width * height)
+        self.tiles = array.array('H', bytes(2 * width * height))    # zero-filled, without building a list first
         self.dirty_tiles = bytearray(width * height)
         self.width = width
         self.height = height
@@ -56,34 +57,45 @@ class Tilesheet:
             self.tiles[pos] = tilenum
             self.dirty_tiles[pos] = 1
 
+    def set_tile(self, pos: int, tilenum: int) -> None:
+        # like __setitem__ but takes the tile index directly and skips the bounds check.
+        # for the hot paths that already know the position is valid.
+        if tilenum != self.tiles[pos]:
+            self.tiles[pos] = tilenum
+            self.dirty_tiles[pos] = 1
+
     def set_tiles(self, x: int, y: int, tile_or_tiles: Union[int, Iterable[int]]) -> None:
         if x < 0 or x >= self.width or y < 0 or y >= self.height:
             raise ValueError("tile xy out of bounds")
         if isinstance(tile_or_tiles, int):
-            # i = x + self.width * y
-            # ol
-            enum_tiles = enumerate([tile_or_tiles], start=x + self.width * y)
-        else:
-            enum_tiles = enumerate(tile_or_tiles, start=x + self.width * y)
-        for i, t in enum_tiles:
-            if t != self.tiles[i]:
-                self.tiles[i] = t
-                self.dirty_tiles[i] = 1
+            self[x, y] = tile_or_tiles
+            return
+        new_tiles = array.array('H', tile_or_tiles)
+        start = x + self.width * y
+        end = start + len(new_tiles)
+        if end > len(self.tiles):
+            raise ValueError("tiles out of bounds")
+        old_tiles = self.tiles[start:end]
+        if old_tiles != new_tiles:
+            # replace the whole run at once, but only flag the tiles that actually changed as dirty
+            self.tiles[start:end] = new_tiles
+            dirty_tiles = self.dirty_tiles
+            for i, old, new in zip(range(start, end), old_tiles, new_tiles):
+                if old != new:
+                    dirty_tiles[i] = 1
 
     def get_tiles(self, x: int, y: int, width: int, height: int) -> Sequence[Iterable[int]]:
         if x < 0 or x >= self.width or y < 0 or y > self.height:
             raise ValueError("tile xy out of bounds")
         if width <= 0 or x + width > self.width or height <= 0 or y + height > self.height:
             raise ValueError("width or height out of bounds")
-        offset = x + self.width * y
-        result = []
-        for dy in range(height):
-            result.append(self.tiles[offset + self.width * dy: offset + self.width * dy + width])
-        return result
+        # one array slice per row: that is exactly what set_tiles needs to put them back again
+        tiles = self.tiles
+        return [tiles[offset:offset + width] for offset in range(x + self.width * y, x + self.width * (y + height), self.width)]
 
     def all_dirty(self) -> None:
-        for i in range(self.width * self.height):
-            self.dirty_tiles[i] = True
+        # fill in one go rather than flagging the tiles one by one
+        self.dirty_tiles[:] = b"\x01" * len(self.dirty_tiles)
 
     def dirty(self) -> Sequence[Tuple[int, int]]:
         """
@@ -92,15 +104,28 @@ class Tilesheet:
         Calling this will reset the dirty-flag so make sure to only call it once every refresh.
         Returns a list of (tilesheetindex, tilevalue) tuples.
         """
-        tiles = self.tiles
         dirty_tiles = self.dirty_tiles
+        if 1 not in dirty_tiles:
+            return []   # nothing at all has changed (this is a single memchr)
+        tiles = self.tiles
+        find = dirty_tiles.find
         diff = []
-        for y in range(max(self.view_y - 1, 0), min(self.view_y + self.view_height + 1, self.height)):
-            yy = self.width * y
-            for x in range(max(self.view_x - 1, 0), min(self.view_x + self.view_width + 1, self.width)):
-                if dirty_tiles[x + yy]:
-                    diff.append((x + yy, tiles[x + yy]))
-                    dirty_tiles[x + yy] = False
+        x_start = max(self.view_x - 1, 0)
+        x_end = min(self.view_x + self.view_width + 1, self.width)
+        y_start = max(self.view_y - 1, 0)
+        y_end = min(self.view_y + self.view_height + 1, self.height)
+        if x_start == 0 and x_end == self.width:
+            # the view covers complete rows (the usual case), so the rows form one contiguous range to scan
+            ranges = [(self.width * y_start, self.width * y_end)]
+        else:
+            ranges = [(self.width * y + x_start, self.width * y + x_end) for y in range(y_start, y_end)]
+        for start, end in ranges:
+            # bytearray.find skips over the clean tiles at C speed
+            i = find(1, start, end)
+            while i >= 0:
+                diff.append((i, tiles[i]))
+                dirty_tiles[i] = 0
+                i = find(1, i + 1, end)
         return diff
 
 
@@ -114,8 +139,17 @@ def tile2pixels(tx: int, ty: int) -> Tuple[int, int]:
 num_sprites = 432   # after these, the font tiles are placed
 
 
-def text2tiles(text: str) -> Sequence[int]:
-    return [num_sprites + ord(c) for c in text]
+@functools.lru_cache(maxsize=256)
+def text2tiles(text: str) -> Tuple[int, ...]:
+    # cached, because the same texts (score bar, popups) are converted over and over again.
+    # returns a tuple so the cached result can't be modified by accident.
+    return tuple(num_sprites + ord(c) for c in text)
+
+
+def image2ppm(image: Image.Image) -> bytes:
+    # Tk decodes PPM image data directly, this is a lot faster than encoding and decoding a gif or png.
+    image = image.convert("RGB")
+    return "P6\n{:d} {:d}\n255\n".format(image.width, image.height).encode("ascii") + image.tobytes()
 
 
 def load_sprites(c64colorpalette: Palette=None, scale: float=1.0, alt_c64tileset=False) -> Sequence[bytes]:
@@ -147,24 +181,34 @@ def load_sprites(c64colorpalette: Palette=None, scale: float=1.0, alt_c64tileset
             for rgb in palette:
                 palettevalues.extend(rgb)
             tile_image.putpalette(palettevalues)
-        tile_num = 0
         if tile_image.width != 128:
             raise IOError("sprites image width should be 8 sprites of 16 pixels = 128 pixels")
         scaling_method = Image.NEAREST
         if hasattr(Image, "HAMMING"):
             scaling_method = Image.HAMMING
-        while True:
-            row, col = divmod(tile_num, 8)
-            if row * 16 >= tile_image.height:
-                break
-            ci = tile_image.crop((col * 16, row * 16, col * 16 + 16, row * 16 + 16))
-            if scale != 1:
-                ci = ci.resize((int(16 * scale), int(16 * scale)), scaling_method)
-            out = io.BytesIO()
-            ci = ci.convert(mode="P")
-            ci.save(out, "gif")
-            sprite_src_images.append(out.getvalue())
-            tile_num += 1
+        whole_sheet = c64colorpalette and scale == int(scale)
+        if whole_sheet:
+            # pillow always resizes a palette image using nearest neighbour (whatever the scaling method),
+            # so for whole scaling factors there is no difference between scaling the sprites one by one,
+            # or scaling the whole sheet at once and cutting the sprites from that.
+            tile_size = int(16 * scale)
+            sheet = tile_image.resize((8 * tile_size, tile_image.height // 16 * tile_size), scaling_method).convert("RGB")
+            for tile_num in range(sheet.height // tile_size * 8):
+                row, col = divmod(tile_num, 8)
+                sprite_src_images.append(image2ppm(sheet.crop((col * tile_size, row * tile_size,
+                                                               col * tile_size + tile_size, row * tile_size + tile_size))))
+        else:
+            tile_num = 0
+            while True:
+                row, col = divmod(tile_num, 8)
+                if row * 16 >= tile_image.height:
+                    break
+                ci = tile_image.crop((col * 16, row * 16, col * 16 + 16, row * 16 + 16))
+                if scale != 1:
+                    ci = ci.resize((int(16 * scale), int(16 * scale)), scaling_method)
+                # (the conversion to palette mode is kept so the colors stay exactly the same as they always were)
+                sprite_src_images.append(image2ppm(ci.convert(mode="P")))
+                tile_num += 1
     if len(sprite_src_images) != num_sprites:
         raise IOError("sprite sheet image should contain {:d} tiles of 16*16 pixels".format(num_sprites))
     return sprite_src_images
@@ -183,7 +227,5 @@ def load_font(scale: float=1.0) -> Sequence[bytes]:
             ci = image.crop((col * 8, row * 8, col * 8 + 8, row * 8 + 8))
             if scale != 1:
                 ci = ci.resize((int(8 * scale), int(8 * scale)), scaling_method)
-            out = io.BytesIO()
-            ci.save(out, "gif")
-            font_src_images.append(out.getvalue())
+            font_src_images.append(image2ppm(ci))
     return font_src_images